@@ -5,29 +5,46 @@ This module provides the command-line interface for the ServiceNow MCP server.
 """
 
 import argparse
+import functools
 import os
 import sys
-from dotenv import load_dotenv
 
-from mcp_server_servicenow.server import ServiceNowMCP, create_basic_auth
-
-def main():
-    """Run the ServiceNow MCP server from the command line"""
-    # Load environment variables from .env file if it exists
-    load_dotenv()
-    
+@functools.lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser once; environment defaults are applied per call in main()"""
     parser = argparse.ArgumentParser(description="ServiceNow MCP Server")
-    parser.add_argument("--url", help="ServiceNow instance URL", default=os.environ.get("SERVICENOW_INSTANCE_URL"))
+    parser.add_argument("--url", help="ServiceNow instance URL")
     parser.add_argument("--transport", help="Transport protocol (stdio or sse)", default="stdio", choices=["stdio", "sse"])
     
     # Authentication options
     auth_group = parser.add_argument_group("Authentication")
-    auth_group.add_argument("--username", help="ServiceNow username", default=os.environ.get("SERVICENOW_USERNAME"))
-    auth_group.add_argument("--password", help="ServiceNow password", default=os.environ.get("SERVICENOW_PASSWORD"))
-    auth_group.add_argument("--token", help="ServiceNow token", default=os.environ.get("SERVICENOW_TOKEN"))
-    auth_group.add_argument("--client-id", help="OAuth client ID", default=os.environ.get("SERVICENOW_CLIENT_ID"))
-    auth_group.add_argument("--client-secret", help="OAuth client secret", default=os.environ.get("SERVICENOW_CLIENT_SECRET"))
+    auth_group.add_argument("--username", help="ServiceNow username")
+    auth_group.add_argument("--password", help="ServiceNow password")
+    auth_group.add_argument("--token", help="ServiceNow token")
+    auth_group.add_argument("--client-id", help="OAuth client ID")
+    auth_group.add_argument("--client-secret", help="OAuth client secret")
+    
+    return parser
+
+def main():
+    """Run the ServiceNow MCP server from the command line"""
+    # Load environment variables from .env file if it exists. SERVICENOW_ENV_FILE
+    # points at a different file and SERVICENOW_SKIP_DOTENV disables loading
+    env_file = os.environ.get("SERVICENOW_ENV_FILE", ".env")
+    if not os.environ.get("SERVICENOW_SKIP_DOTENV") and os.path.isfile(env_file):
+        from dotenv import load_dotenv
+        load_dotenv(env_file)
     
+    parser = _build_parser()
+    # Read environment defaults at call time so a cached parser never serves stale values
+    parser.set_defaults(
+        url=os.environ.get("SERVICENOW_INSTANCE_URL"),
+        username=os.environ.get("SERVICENOW_USERNAME"),
+        password=os.environ.get("SERVICENOW_PASSWORD"),
+        token=os.environ.get("SERVICENOW_TOKEN"),
+        client_id=os.environ.get("SERVICENOW_CLIENT_ID"),
+        client_secret=os.environ.get("SERVICENOW_CLIENT_SECRET"),
+    )
     args = parser.parse_args()
     
     # Check required parameters
@@ -36,7 +53,8 @@ def main():
         print("Set SERVICENOW_INSTANCE_URL environment variable or use --url")
         sys.exit(1)
     
-    # Determine authentication method
+    # Determine authentication method. Server imports are deferred until here
+    # so --help and argument errors don't pay for loading the MCP stack
     auth = None
     if args.token:
         from mcp_server_servicenow.server import create_token_auth
@@ -45,6 +63,7 @@ def main():
         from mcp_server_servicenow.server import create_oauth_auth
         auth = create_oauth_auth(args.client_id, args.client_secret, args.username, args.password, args.url)
     elif args.username and args.password:
+        from mcp_server_servicenow.server import create_basic_auth
         auth = create_basic_auth(args.username, args.password)
     else:
         print("Error: Authentication credentials required")
@@ -52,6 +71,7 @@ def main():
         sys.exit(1)
     
     # Create and run the server
+    from mcp_server_servicenow.server import ServiceNowMCP
     server = ServiceNowMCP(instance_url=args.url, auth=auth)
     server.run(transport=args.transport)
 
@@ -4,183 +4,320 @@ Natural Language Processing for ServiceNow MCP Server
 This module provides natural language processing capabilities for the ServiceNow MCP server.
 """
 
+import functools
 import re
+from types import MappingProxyType
 from typing import Dict, Any, Tuple, List, Optional
 
-class NLPProcessor:
-    """Natural Language Processing for ServiceNow queries and commands"""
-    
-    @staticmethod
-    def parse_search_query(query: str) -> Dict[str, Any]:
-        """
-        Parse a natural language search query
-        
-        Examples:
-        - "find all incidents about SAP"
-        - "search for incidents related to email"
-        - "show me all incidents with high priority"
-        
-        Returns:
-            Dict with table, query, and other parameters
-        """
-        # Default to incident table
-        table = "incident"
-        
-        # Extract table if specified
-        table_match = re.search(r'(incidents?|problems?|changes?|tasks?|users?|groups?)', query, re.IGNORECASE)
-        if table_match:
-            table_type = table_match.group(1).lower()
-            if table_type.startswith('incident'):
-                table = "incident"
-            elif table_type.startswith('problem'):
-                table = "problem"
-            elif table_type.startswith('change'):
-                table = "change_request"
-            elif table_type.startswith('task'):
-                table = "task"
-            elif table_type.startswith('user'):
-                table = "sys_user"
-            elif table_type.startswith('group'):
-                table = "sys_user_group"
-        
-        # Extract search terms
-        about_match = re.search(r'(?:about|related to|regarding|concerning|with|containing)\s+([^\.]+)', query, re.IGNORECASE)
-        search_term = ""
-        if about_match:
-            search_term = about_match.group(1).strip()
-        else:
-            # Try to find any terms after common search phrases
-            term_match = re.search(r'(?:find|search for|show|get|list|display)\s+(?:all|any|)(?:\s+\w+)?\s+(?:\w+\s+)?(.+)', query, re.IGNORECASE)
-            if term_match:
-                search_term = term_match.group(1).strip()
-        
-        # Extract priority if mentioned
-        priority = None
-        if re.search(r'\b(high|critical)\s+priority\b', query, re.IGNORECASE):
-            priority = "1"
-        elif re.search(r'\b(medium)\s+priority\b', query, re.IGNORECASE):
-            priority = "2"
-        elif re.search(r'\b(low)\s+priority\b', query, re.IGNORECASE):
-            priority = "3"
-        
-        # Extract state if mentioned
-        state = None
-        if re.search(r'\b(new|open)\b', query, re.IGNORECASE):
-            state = "1"
-        elif re.search(r'\b(in progress|working)\b', query, re.IGNORECASE):
-            state = "2"
-        elif re.search(r'\b(closed|resolved)\b', query, re.IGNORECASE):
-            state = "7"
-        
-        # Build the query string
+# Patterns are compiled once at import time rather than on every parse call.
+# Apart from _FILENAME_RE they are matched against lowercased text (see _lower),
+# so they are written in lowercase and compiled without re.IGNORECASE
+_TABLE_RE = re.compile(r'(incidents?|problems?|changes?|tasks?|users?|groups?)')
+# Table words matched by _TABLE_RE, keyed by their first three letters
+_TABLE_MAP = MappingProxyType({
+    "inc": "incident",
+    "pro": "problem",
+    "cha": "change_request",
+    "tas": "task",
+    "use": "sys_user",
+    "gro": "sys_user_group",
+})
+_ABOUT_RE = re.compile(r'(?:about|related to|regarding|concerning|with|containing)\s+([^\.]+)')
+_TERM_RE = re.compile(r'(?:find|search for|show|get|list|display)\s+(?:all|any|)(?:\s+\w+)?\s+(?:\w+\s+)?(.+)')
+
+# Priority and state keywords are found in a single scan; each named group
+# maps to the field it sets and the value it sets it to
+_PRIO_STATE_RE = re.compile(
+    r'\b(?P<p1>high|critical)\s+priority\b'
+    r'|\b(?P<p2>medium)\s+priority\b'
+    r'|\b(?P<p3>low)\s+priority\b'
+    r'|\b(?P<s1>new|open)\b'
+    r'|\b(?P<s2>in progress|working)\b'
+    r'|\b(?P<s7>closed|resolved)\b'
+)
+_PRIO_STATE_GROUPS = MappingProxyType({
+    "p1": ("priority", "1"),
+    "p2": ("priority", "2"),
+    "p3": ("priority", "3"),
+    "s1": ("state", "1"),
+    "s2": ("state", "2"),
+    "s7": ("state", "7"),
+})
+
+# Every pattern above needs at least one of these substrings to match, so a
+# query containing none of them can skip the regex work entirely
+_SEARCH_HINTS = (
+    "incident", "problem", "change", "task", "user", "group",
+    "about", "related to", "regarding", "concerning", "with", "containing",
+    "find", "search for", "show", "get", "list", "display",
+    "priority", "new", "open", "in progress", "working", "closed", "resolved",
+)
+_SEARCH_HINT_RE = re.compile('|'.join(re.escape(hint) for hint in sorted(_SEARCH_HINTS)))
+
+# Encoded-query prefix for a full-text search term
+_TEXTQUERY_PREFIX = "123TEXTQUERY321="
+
+_NUMBER_RE = re.compile(r'(inc\d+|prb\d+|chg\d+|task\d+)')
+# Free text runs up to the end of the string or the first "." followed by
+# whitespace. The capture is written as an unrolled loop rather than a lazy
+# (.+?) so long comments are consumed in runs instead of one char at a time
+_FREE_TEXT = r'(.[^.\n]*(?:\.(?!\s|$)[^.\n]*)*)(?:$|\.(?:\s|$))'
+_COMMENT_RE = re.compile(r'(?:saying|comment|note|with comment|with note)(?:s|)\s*:?\s*' + _FREE_TEXT)
+_CLOSE_NOTES_RE = re.compile(r'(?:with resolution|resolution|close note|resolve with)(?:s|)\s*:?\s*' + _FREE_TEXT)
+
+_FILENAME_RE = re.compile(r'@([^\s,]+)')
+
+# Literal keywords that only need a whole-word test, checked with str.find
+# instead of going through the regex engine
+_WORKING_KEYWORDS = ("working on", "in progress", "assign")
+_CLOSE_KEYWORDS = ("close", "closed")
+_RESOLVE_KEYWORDS = ("resolve", "resolved", "fix", "fixed")
+_WORK_NOTE_KEYWORDS = ("work note", "internal", "private")
+
+# Script type names mapped to their ServiceNow tables, in match priority order
+_SCRIPT_TYPES = MappingProxyType({
+    "script include": "sys_script_include",
+    "business rule": "sys_script",
+    "client script": "sys_script_client",
+    "ui script": "sys_ui_script",
+    "ui action": "sys_ui_action",
+    "ui page": "sys_ui_page",
+    "ui macro": "sys_ui_macro",
+    "scheduled job": "sysauto_script",
+    "fix script": "sys_script_fix"
+})
+_SCRIPT_TYPE_RANKS = {type_name: rank for rank, type_name in enumerate(_SCRIPT_TYPES)}
+# All script type names in one alternation, wrapped in a lookahead so a single
+# scan also reports types that overlap (e.g. "ui script include")
+_SCRIPT_TYPE_RE = re.compile(
+    r'(?=\b(' + '|'.join(re.escape(type_name) for type_name in _SCRIPT_TYPES) + r')\b)'
+)
+
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+def _lower(text: str) -> str:
+    """Lowercase text, keeping character offsets aligned with the original"""
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # A few characters (e.g. "İ") expand when lowercased; fall back to
+        # ASCII-only folding so offsets and word boundaries stay the same
+        lowered = text.translate(_ASCII_LOWER)
+    return lowered
+
+def _is_word_char(char: str) -> bool:
+    """Return True if char is a regex word character (\\w)"""
+    return char.isalnum() or char == "_"
+
+def _has_keyword(text: str, keywords: Tuple[str, ...]) -> bool:
+    """Return True if any keyword occurs in text as a whole word, like \\b(...)\\b"""
+    for keyword in keywords:
+        start = text.find(keyword)
+        while start != -1:
+            end = start + len(keyword)
+            if ((start == 0 or not _is_word_char(text[start - 1])) and
+                    (end == len(text) or not _is_word_char(text[end]))):
+                return True
+            start = text.find(keyword, start + 1)
+    return False
+
+# The same phrasings tend to come up again and again, so parse results are
+# memoized. The cached forms are immutable; the public functions build a
+# fresh dict from them on every call so callers can't alter a cached result
+_PARSE_CACHE_SIZE = 1024
+
+def parse_search_query(query: str) -> Dict[str, Any]:
+    """
+    Parse a natural language search query
+    
+    Examples:
+    - "find all incidents about SAP"
+    - "search for incidents related to email"
+    - "show me all incidents with high priority"
+    
+    Returns:
+        Dict with table, query, and other parameters
+    """
+    table, query_string = _parse_search_query(query)
+    return {
+        "table": table,
+        "query": query_string,
+        "limit": 10
+    }
+
+@functools.lru_cache(maxsize=_PARSE_CACHE_SIZE)
+def _parse_search_query(query: str) -> Tuple[str, str]:
+    """Parse a search query into its (table, encoded query) pair"""
+    query_lower = _lower(query)
+    if not _SEARCH_HINT_RE.search(query_lower):
+        return "incident", ""
+    
+    # Default to incident table
+    table = "incident"
+    
+    # Extract table if specified
+    table_match = _TABLE_RE.search(query_lower)
+    if table_match:
+        table = _TABLE_MAP[table_match.group(1)[:3]]
+    
+    # Extract search terms
+    # Search terms keep their original case, so slice them out of the query
+    about_match = _ABOUT_RE.search(query_lower)
+    search_term = ""
+    if about_match:
+        search_term = query[about_match.start(1):about_match.end(1)].strip()
+    else:
+        # Try to find any terms after common search phrases
+        term_match = _TERM_RE.search(query_lower)
+        if term_match:
+            search_term = query[term_match.start(1):term_match.end(1)].strip()
+    
+    # Extract priority and state if mentioned. When several keywords for
+    # the same field appear, the lowest value wins (e.g. "new" over "closed")
+    filters = {}
+    for match in _PRIO_STATE_RE.finditer(query_lower):
+        field, value = _PRIO_STATE_GROUPS[match.lastgroup]
+        if field not in filters or value < filters[field]:
+            filters[field] = value
+    priority = filters.get("priority")
+    state = filters.get("state")
+    
+    # Build the query string. Most queries carry only a search term, so that
+    # case is formatted directly instead of going through a parts list
+    if not filters:
+        query_string = f"{_TEXTQUERY_PREFIX}{search_term}" if search_term else ""
+    else:
         query_parts = []
         if search_term:
-            query_parts.append(f"123TEXTQUERY321={search_term}")
+            query_parts.append(f"{_TEXTQUERY_PREFIX}{search_term}")
         if priority:
             query_parts.append(f"priority={priority}")
         if state:
             query_parts.append(f"state={state}")
-        
-        query_string = "^".join(query_parts) if query_parts else ""
-        
-        return {
-            "table": table,
-            "query": query_string,
-            "limit": 10
-        }
-    
-    @staticmethod
-    def parse_update_command(command: str) -> Tuple[str, Dict[str, Any]]:
-        """
-        Parse a natural language update command
-        
-        Examples:
-        - "Update incident INC0010001 saying I'm working on it"
-        - "Set incident INC0010002 to in progress"
-        - "Close incident INC0010003 with resolution: fixed the issue"
-        
-        Returns:
-            Tuple of (record_number, updates_dict)
-        """
-        # Extract record number
-        number_match = re.search(r'(INC\d+|PRB\d+|CHG\d+|TASK\d+)', command, re.IGNORECASE)
-        if not number_match:
-            raise ValueError("No record number found in command")
-        
-        record_number = number_match.group(1).upper()
-        
-        # Initialize updates dictionary
-        updates = {}
-        
-        # Check for state changes
-        if re.search(r'\b(working on|in progress|assign)\b', command, re.IGNORECASE):
-            updates["state"] = 2  # In Progress
-        elif re.search(r'\b(close|closed)\b', command, re.IGNORECASE):
-            # Explicit close should override any resolve keywords
-            updates["state"] = 7  # Closed
-        elif re.search(r'\b(resolve|resolved|fix|fixed)\b', command, re.IGNORECASE):
-            updates["state"] = 6  # Resolved
-        
-        # Extract comments or work notes
-        comment_match = re.search(r'(?:saying|comment|note|with comment|with note)(?:s|)\s*:?\s*(.+?)(?:$|\.(?:\s|$))', command, re.IGNORECASE)
-        if comment_match:
-            comment_text = comment_match.group(1).strip()
-            # Determine if this should be a comment or work note
-            if re.search(r'\b(work note|internal|private)\b', command, re.IGNORECASE):
-                updates["work_notes"] = comment_text
-            else:
-                updates["comments"] = comment_text
-        
-        # Extract close notes if closing
-        if "state" in updates and updates["state"] in [6, 7]:
-            close_match = re.search(r'(?:with resolution|resolution|close note|resolve with)(?:s|)\s*:?\s*(.+?)(?:$|\.(?:\s|$))', command, re.IGNORECASE)
-            if close_match:
-                updates["close_notes"] = close_match.group(1).strip()
-                updates["close_code"] = "Solved (Permanently)"
-        
-        return record_number, updates
-    
-    @staticmethod
-    def parse_script_update(command: str) -> Tuple[str, str, str]:
-        """
-        Parse a command to update a ServiceNow script file
-        
-        Examples:
-        - "update @my_script.js, it's a script include"
-        - "update @business_rule.js, it's a business rule"
-        
-        Returns:
-            Tuple of (filename, script_type, script_content)
-        """
-        # Extract filename
-        filename_match = re.search(r'@([^\s,]+)', command)
-        if not filename_match:
-            raise ValueError("No filename found in command")
-        
-        filename = filename_match.group(1)
-        
-        # Extract script type
-        script_types = {
-            "script include": "sys_script_include",
-            "business rule": "sys_script",
-            "client script": "sys_script_client",
-            "ui script": "sys_ui_script",
-            "ui action": "sys_ui_action",
-            "ui page": "sys_ui_page",
-            "ui macro": "sys_ui_macro",
-            "scheduled job": "sysauto_script",
-            "fix script": "sys_script_fix"
-        }
-        
-        script_type = None
-        for type_name, table_name in script_types.items():
-            if re.search(rf"\b{type_name}\b", command, re.IGNORECASE):
-                script_type = table_name
-                break
-        
-        if not script_type:
-            # Default to script include if not specified
-            script_type = "sys_script_include"
-        
-        # The script content will be provided separately
-        return filename, script_type, ""
+
+        query_string = "^".join(query_parts)
+    
+    return table, query_string
+
+def parse_search_query_batch(queries: List[str]) -> List[Dict[str, Any]]:
+    """
+    Parse several natural language search queries
+    
+    Repeated queries within a batch are parsed once and served from the
+    parse cache.
+    
+    Returns:
+        List of dicts in the same order as queries, as from parse_search_query
+    """
+    return [
+        {"table": table, "query": query_string, "limit": 10}
+        for table, query_string in map(_parse_search_query, queries)
+    ]
+
+def parse_update_command(command: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Parse a natural language update command
+    
+    Examples:
+    - "Update incident INC0010001 saying I'm working on it"
+    - "Set incident INC0010002 to in progress"
+    - "Close incident INC0010003 with resolution: fixed the issue"
+    
+    Returns:
+        Tuple of (record_number, updates_dict)
+    """
+    record_number, updates = _parse_update_command(command)
+    return record_number, dict(updates)
+
+@functools.lru_cache(maxsize=_PARSE_CACHE_SIZE)
+def _parse_update_command(command: str) -> Tuple[str, Tuple[Tuple[str, Any], ...]]:
+    """Parse an update command into its record number and update items"""
+    command_lower = _lower(command)
+    
+    # Extract record number
+    number_match = _NUMBER_RE.search(command_lower)
+    if not number_match:
+        raise ValueError("No record number found in command")
+    
+    record_number = number_match.group(1).upper()
+    
+    # Initialize updates dictionary
+    updates = {}
+    
+    # Check for state changes
+    if _has_keyword(command_lower, _WORKING_KEYWORDS):
+        updates["state"] = 2  # In Progress
+    elif _has_keyword(command_lower, _CLOSE_KEYWORDS):
+        # Explicit close should override any resolve keywords
+        updates["state"] = 7  # Closed
+    elif _has_keyword(command_lower, _RESOLVE_KEYWORDS):
+        updates["state"] = 6  # Resolved
+    
+    # Extract comments or work notes
+    comment_match = _COMMENT_RE.search(command_lower)
+    if comment_match:
+        comment_text = command[comment_match.start(1):comment_match.end(1)].strip()
+        # Determine if this should be a comment or work note
+        if _has_keyword(command_lower, _WORK_NOTE_KEYWORDS):
+            updates["work_notes"] = comment_text
+        else:
+            updates["comments"] = comment_text
+    
+    # Extract close notes if closing
+    if "state" in updates and updates["state"] in [6, 7]:
+        close_match = _CLOSE_NOTES_RE.search(command_lower)
+        if close_match:
+            updates["close_notes"] = command[close_match.start(1):close_match.end(1)].strip()
+            updates["close_code"] = "Solved (Permanently)"
+    
+    return record_number, tuple(updates.items())
+
+@functools.lru_cache(maxsize=_PARSE_CACHE_SIZE)
+def parse_script_update(command: str) -> Tuple[str, str, str]:
+    """
+    Parse a command to update a ServiceNow script file
+    
+    Examples:
+    - "update @my_script.js, it's a script include"
+    - "update @business_rule.js, it's a business rule"
+    
+    Returns:
+        Tuple of (filename, script_type, script_content)
+    """
+    # Extract filename
+    filename_match = _FILENAME_RE.search(command)
+    if not filename_match:
+        raise ValueError("No filename found in command")
+    
+    filename = filename_match.group(1)
+    
+    # Extract script type, preferring types listed earlier in _SCRIPT_TYPES
+    script_type = None
+    type_names = [match.group(1) for match in _SCRIPT_TYPE_RE.finditer(_lower(command))]
+    if type_names:
+        script_type = _SCRIPT_TYPES[min(type_names, key=_SCRIPT_TYPE_RANKS.__getitem__)]
+    
+    if not script_type:
+        # Default to script include if not specified
+        script_type = "sys_script_include"
+    
+    # The script content will be provided separately
+    return filename, script_type, ""
+
+
+class NLPProcessor:
+    """Natural Language Processing for ServiceNow queries and commands
+    
+    Thin facade over the module-level parse functions, kept for existing callers.
+    """
+    
+    parse_search_query = staticmethod(parse_search_query)
+    parse_search_query_batch = staticmethod(parse_search_query_batch)
+    parse_update_command = staticmethod(parse_update_command)
+    parse_script_update = staticmethod(parse_script_update)
+
+
+# Run each parser once at import so the first real query doesn't pay for the
+# interpreter's and regex engine's first-use setup on these code paths
+parse_search_query("find all incidents about warmup with high priority")
+parse_update_command("close incident INC0000000 saying warmup with resolution: warmup")
+parse_script_update("update @warmup.js, it's a business rule")
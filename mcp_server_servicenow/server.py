@@ -6,25 +6,39 @@ It allows AI agents to access and manipulate ServiceNow data through a secure AP
 """
 
 import os
-import json
 import asyncio
+import base64
+import functools
 import logging
-import re
+import time
 from datetime import datetime
 from enum import Enum
-from typing import Dict, List, Optional, Any, Union, Literal, Tuple
+from urllib.parse import quote
+from typing import Awaitable, Dict, List, Optional, Any, Union, Literal, Tuple
 
 import requests
 import httpx
-from pydantic import BaseModel, Field, field_validator
-
-from mcp_server_servicenow.nlp import NLPProcessor
+import orjson
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 from mcp.server.fastmcp import FastMCP, Context
 from mcp.server.fastmcp.utilities.logging import get_logger
 
 logger = get_logger(__name__)
 
+def _json_dumps(data: Any, indent: bool = True) -> str:
+    """Serialize data to a JSON string, pretty-printed unless indent is False"""
+    return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else None).decode()
+
+# Fixed error envelope returned when a record lookup comes back empty
+_NO_RECORD_FOUND = _json_dumps({
+    "error": {
+        "message": "No Record found",
+        "detail": "Record doesn't exist or ACL restricts the record retrieval"
+    },
+    "status": "failure"
+}, indent=False)
+
 # ServiceNow API models
 class IncidentState(int, Enum):
     NEW = 1
@@ -85,8 +99,9 @@ class IncidentUpdate(BaseModel):
             raise ValueError("Cannot be an empty string")
         return v
 
-    class Config:
-        use_enum_values = True
+    # Kept alongside model_dump(mode="json") so attribute access on a parsed
+    # update also yields plain values rather than enum members
+    model_config = ConfigDict(use_enum_values=True)
 
 class CaseCreate(BaseModel):
     """Model for creating a new customer service case"""
@@ -107,23 +122,45 @@ class QueryOptions(BaseModel):
     order_by: Optional[str] = Field(None, description="Field to order results by")
     order_direction: Optional[Literal["asc", "desc"]] = Field("desc", description="Order direction")
 
+# Options used by the list resources, built once without validation. get_records
+# recognises them and sends the matching params as is; neither may be mutated
+_DEFAULT_LIST_OPTIONS = QueryOptions.model_construct(limit=10, offset=0)
+_DEFAULT_LIST_PARAMS = {"sysparm_limit": 10, "sysparm_offset": 0}
+
 class Authentication:
     """Base class for ServiceNow authentication methods"""
     
-    async def get_headers(self) -> Dict[str, str]:
-        """Get authentication headers for ServiceNow API requests"""
+    __slots__ = ()
+    
+    def get_headers(self) -> Dict[str, str]:
+        """Get headers for ServiceNow API requests
+        
+        The returned dict is shared between requests and must not be modified.
+        """
         raise NotImplementedError("Subclasses must implement this method")
+    
+    def needs_refresh(self) -> bool:
+        """Return True if refresh() must be awaited before get_headers()"""
+        return False
+    
+    async def refresh(self):
+        """Refresh the credentials; static credentials have nothing to do"""
 
 class BasicAuth(Authentication):
     """Basic authentication for ServiceNow"""
     
+    __slots__ = ("username", "password", "_cached_headers")
+    
     def __init__(self, username: str, password: str):
         self.username = username
         self.password = password
+        # Encoded once here rather than by httpx on every request
+        credentials = base64.b64encode(f"{username}:{password}".encode("utf-8")).decode("ascii")
+        self._cached_headers = {"Authorization": f"Basic {credentials}", "Accept": "application/json"}
         
-    async def get_headers(self) -> Dict[str, str]:
-        """Get authentication headers for ServiceNow API requests"""
-        return {}
+    def get_headers(self) -> Dict[str, str]:
+        """Get headers for ServiceNow API requests"""
+        return self._cached_headers
     
     def get_auth(self) -> tuple:
         """Get authentication tuple for requests"""
@@ -132,20 +169,31 @@ class BasicAuth(Authentication):
 class TokenAuth(Authentication):
     """Token authentication for ServiceNow"""
     
+    __slots__ = ("token", "_cached_headers")
+    
     def __init__(self, token: str):
         self.token = token
+        self._cached_headers = {"Authorization": f"Bearer {token}", "Accept": "application/json"}
         
-    async def get_headers(self) -> Dict[str, str]:
-        """Get authentication headers for ServiceNow API requests"""
-        return {"Authorization": f"Bearer {self.token}"}
+    def get_headers(self) -> Dict[str, str]:
+        """Get headers for ServiceNow API requests"""
+        return self._cached_headers
     
     def get_auth(self) -> None:
         """Get authentication tuple for requests"""
         return None
 
+# Tokens are refreshed this many seconds before they expire, so a request
+# never goes out with a token that lapses in flight
+_TOKEN_EXPIRY_SKEW = 60
+
 class OAuthAuth(Authentication):
     """OAuth authentication for ServiceNow"""
     
+    __slots__ = ("client_id", "client_secret", "username", "password", "instance_url",
+                 "token", "refresh_token", "token_expiry", "_client", "_refresh_lock",
+                 "_cached_headers")
+    
     def __init__(self, client_id: str, client_secret: str, username: str, password: str, 
                  instance_url: str, token: Optional[str] = None, refresh_token: Optional[str] = None,
                  token_expiry: Optional[datetime] = None):
@@ -156,21 +204,52 @@ class OAuthAuth(Authentication):
         self.instance_url = instance_url
         self.token = token
         self.refresh_token = refresh_token
-        self.token_expiry = token_expiry
-        
-    async def get_headers(self) -> Dict[str, str]:
-        """Get authentication headers for ServiceNow API requests"""
-        if self.token is None or (self.token_expiry and datetime.now() > self.token_expiry):
-            await self.refresh()
-            
-        return {"Authorization": f"Bearer {self.token}"}
+        # Expiry is tracked on the monotonic clock; a wall-clock expiry passed
+        # in is converted relative to now
+        self.token_expiry: Optional[float] = None
+        if token_expiry is not None:
+            remaining = (token_expiry - datetime.now(token_expiry.tzinfo)).total_seconds()
+            self.token_expiry = time.monotonic() + remaining - _TOKEN_EXPIRY_SKEW
+        self._client: Optional[httpx.AsyncClient] = None
+        # Created on first use so it belongs to the running event loop
+        self._refresh_lock: Optional[asyncio.Lock] = None
+        # Rebuilt from the current token whenever it changes
+        self._cached_headers: Optional[Dict[str, str]] = None
+        
+    def set_client(self, client: httpx.AsyncClient):
+        """Share an HTTP client so token refreshes reuse its pooled connections"""
+        self._client = client
+        
+    def needs_refresh(self) -> bool:
+        """Return True if there is no token or it is due for a refresh"""
+        return self.token is None or (self.token_expiry is not None and time.monotonic() >= self.token_expiry)
+        
+    def get_headers(self) -> Dict[str, str]:
+        """Get headers for ServiceNow API requests"""
+        if self._cached_headers is None:
+            self._cached_headers = {"Authorization": f"Bearer {self.token}", "Accept": "application/json"}
+        return self._cached_headers
     
     def get_auth(self) -> None:
         """Get authentication tuple for requests"""
         return None
         
     async def refresh(self):
-        """Refresh the OAuth token"""
+        """Refresh the OAuth token
+        
+        Concurrent calls are coalesced: a caller that waited while another
+        refresh ran reuses the token it fetched.
+        """
+        stale_token = self.token
+        if self._refresh_lock is None:
+            self._refresh_lock = asyncio.Lock()
+        async with self._refresh_lock:
+            if self.token is not stale_token:
+                return
+            await self._request_token()
+            
+    async def _request_token(self):
+        """Request a new OAuth token from the instance"""
         if self.refresh_token:
             # Try refresh flow first
             data = {
@@ -190,15 +269,44 @@ class OAuthAuth(Authentication):
             }
             
         token_url = f"{self.instance_url}/oauth_token.do"
-        async with httpx.AsyncClient() as client:
-            response = await client.post(token_url, data=data)
-            response.raise_for_status()
-            result = response.json()
-            
-            self.token = result["access_token"]
-            self.refresh_token = result.get("refresh_token")
-            expires_in = result.get("expires_in", 1800)  # Default 30 minutes
-            self.token_expiry = datetime.now().timestamp() + expires_in
+        if self._client is not None and not self._client.is_closed:
+            response = await self._client.post(token_url, data=data)
+        else:
+            # No shared client (auth used on its own), so open a short-lived one
+            async with httpx.AsyncClient() as client:
+                response = await client.post(token_url, data=data)
+        response.raise_for_status()
+        result = orjson.loads(response.content)
+        
+        self._cached_headers = None
+        self.token = result["access_token"]
+        self.refresh_token = result.get("refresh_token")
+        expires_in = result.get("expires_in", 1800)  # Default 30 minutes
+        self.token_expiry = time.monotonic() + expires_in - _TOKEN_EXPIRY_SKEW
+
+# Connection pool settings for the shared HTTP client. Tool calls often come in
+# bursts (e.g. a number lookup followed by an update), so idle connections are
+# kept open long enough to be reused instead of paying a new TLS handshake
+_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=100, keepalive_expiry=60.0)
+_HTTP_TIMEOUT = httpx.Timeout(30.0)
+
+# Prefixes of human-readable record numbers, by table. get_record uses them to
+# spot a number passed where a sys_id was expected
+_NUMBER_PREFIXES = {"incident": "INC", "change_request": "CHG", "problem": "PRB"}
+
+# Resolved record numbers are remembered for this many seconds, so a run of
+# operations on the same record only looks its sys_id up once. The cache is
+# bounded; the oldest entry is dropped when it is full
+_SYS_ID_CACHE_TTL = 60.0
+_SYS_ID_CACHE_SIZE = 1024
+
+def _safe_path(*parts: str) -> str:
+    """Join URL path segments, percent-encoding each one
+    
+    Table names and sys_ids come from tool arguments, so a "/", "?" or "#"
+    in one must not change which endpoint the request goes to.
+    """
+    return "/".join(quote(part, safe="") for part in parts)
 
 class ServiceNowClient:
     """Client for interacting with ServiceNow API"""
@@ -206,7 +314,11 @@ class ServiceNowClient:
     def __init__(self, instance_url: str, auth: Authentication):
         self.instance_url = instance_url.rstrip('/')
         self.auth = auth
-        self.client = httpx.AsyncClient()
+        self.client = httpx.AsyncClient(limits=_HTTP_LIMITS, http2=True, timeout=_HTTP_TIMEOUT)
+        if isinstance(auth, OAuthAuth):
+            auth.set_client(self.client)
+        # (table, number) -> (sys_id, expiry on the monotonic clock)
+        self._sys_id_cache: Dict[Tuple[str, str], Tuple[str, float]] = {}
         
     async def close(self):
         """Close the HTTP client"""
@@ -217,46 +329,52 @@ class ServiceNowClient:
                     json_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Make a request to the ServiceNow API"""
         url = f"{self.instance_url}{path}"
-        headers = await self.auth.get_headers()
-        headers["Accept"] = "application/json"
+        if self.auth.needs_refresh():
+            await self.auth.refresh()
+        headers = self.auth.get_headers()
+        
+        # Bodies are encoded with orjson rather than httpx's stdlib json encoder
+        content = None
+        if json_data is not None:
+            content = orjson.dumps(json_data)
+            headers = {**headers, "Content-Type": "application/json"}
         
-        if isinstance(self.auth, BasicAuth):
-            auth = self.auth.get_auth()
-        else:
-            auth = None
-            
         try:
+            # The body is read in full before request() returns, so .content
+            # is already one contiguous buffer for orjson to parse
             response = await self.client.request(
                 method=method,
                 url=url,
                 params=params,
-                json=json_data,
-                headers=headers,
-                auth=auth
+                content=content,
+                headers=headers
             )
             response.raise_for_status()
-            return response.json()
+            return orjson.loads(response.content)
         except httpx.HTTPStatusError as e:
             logger.error(f"ServiceNow API error: {e.response.text}")
             raise
             
     async def get_record(self, table: str, sys_id: str) -> Dict[str, Any]:
         """Get a record by sys_id"""
-        if table == "incident" and sys_id.startswith("INC"):
-            # This is an incident number, not a sys_id
-            logger.warning(f"Attempted to use get_record with incident number instead of sys_id: {sys_id}")
-            logger.warning("Redirecting to get_incident_by_number method")
-            result = await self.get_incident_by_number(sys_id)
+        # A sys_id is always 32 characters, so only other lengths can be a
+        # record number passed by mistake
+        prefix = _NUMBER_PREFIXES.get(table) if len(sys_id) != 32 else None
+        if prefix is not None and sys_id.startswith(prefix):
+            # This is a record number, not a sys_id
+            logger.warning(f"Attempted to use get_record with {table} number instead of sys_id: {sys_id}")
+            logger.warning("Redirecting to get_record_by_number method")
+            result = await self.get_record_by_number(table, sys_id)
             if result:
                 return {"result": result}
             else:
-                raise ValueError(f"Incident not found: {sys_id}")
-        return await self.request("GET", f"/api/now/table/{table}/{sys_id}")
+                raise ValueError(f"Record not found in {table}: {sys_id}")
+        return await self.request("GET", f"/api/now/table/{_safe_path(table, sys_id)}")
         
-    async def get_records(self, table: str, options: QueryOptions = None) -> Dict[str, Any]:
+    def get_records(self, table: str, options: QueryOptions = None) -> Awaitable[Dict[str, Any]]:
         """Get records with query options"""
-        if options is None:
-            options = QueryOptions()
+        if options is None or options is _DEFAULT_LIST_OPTIONS:
+            return self.request("GET", f"/api/now/table/{_safe_path(table)}", params=_DEFAULT_LIST_PARAMS)
             
         params = {
             "sysparm_limit": options.limit,
@@ -273,32 +391,78 @@ class ServiceNowClient:
             direction = "desc" if options.order_direction == "desc" else "asc"
             params["sysparm_order_by"] = f"{options.order_by}^{direction}"
             
-        return await self.request("GET", f"/api/now/table/{table}", params=params)
+        return self.request("GET", f"/api/now/table/{_safe_path(table)}", params=params)
     
-    async def create_record(self, table: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    def create_record(self, table: str, data: Dict[str, Any]) -> Awaitable[Dict[str, Any]]:
         """Create a new record"""
-        return await self.request("POST", f"/api/now/table/{table}", json_data=data)
+        return self.request("POST", f"/api/now/table/{_safe_path(table)}", json_data=data)
         
-    async def update_record(self, table: str, sys_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    def update_record(self, table: str, sys_id: str, data: Dict[str, Any]) -> Awaitable[Dict[str, Any]]:
         """Update an existing record"""
-        return await self.request("PUT", f"/api/now/table/{table}/{sys_id}", json_data=data)
+        return self.request("PUT", f"/api/now/table/{_safe_path(table, sys_id)}", json_data=data)
         
-    async def delete_record(self, table: str, sys_id: str) -> Dict[str, Any]:
-        """Delete a record"""
-        return await self.request("DELETE", f"/api/now/table/{table}/{sys_id}")
+    async def bulk_update(self, table: str,
+                          items: List[Tuple[str, Dict[str, Any]]]) -> List[Union[Dict[str, Any], BaseException]]:
+        """Update several records concurrently over the pooled connections
         
-    async def get_incident_by_number(self, number: str) -> Dict[str, Any]:
-        """Get an incident by its number"""
-        result = await self.request("GET", f"/api/now/table/incident", 
+        Returns one entry per (sys_id, data) item, in order: the API response,
+        or the exception raised for that record.
+        """
+        return await asyncio.gather(*(self.update_record(table, sys_id, data) for sys_id, data in items),
+                                    return_exceptions=True)
+        
+    def delete_record(self, table: str, sys_id: str) -> Awaitable[Dict[str, Any]]:
+        """Delete a record"""
+        # A deleted record's number must not keep resolving to its sys_id
+        for key in [key for key, (cached_id, _) in self._sys_id_cache.items() if cached_id == sys_id]:
+            del self._sys_id_cache[key]
+        return self.request("DELETE", f"/api/now/table/{_safe_path(table, sys_id)}")
+        
+    def _cache_sys_id(self, table: str, number: str, sys_id: str):
+        """Remember the sys_id a record number resolved to"""
+        if len(self._sys_id_cache) >= _SYS_ID_CACHE_SIZE:
+            del self._sys_id_cache[next(iter(self._sys_id_cache))]
+        self._sys_id_cache[(table, number)] = (sys_id, time.monotonic() + _SYS_ID_CACHE_TTL)
+        
+    async def get_record_by_number(self, table: str, number: str) -> Optional[Dict[str, Any]]:
+        """Get a record by its number"""
+        result = await self.request("GET", f"/api/now/table/{_safe_path(table)}", 
                                   params={"sysparm_query": f"number={number}", "sysparm_limit": 1})
         if result.get("result") and len(result["result"]) > 0:
-            return result["result"][0]
+            record = result["result"][0]
+            if "sys_id" in record:
+                self._cache_sys_id(table, number, record["sys_id"])
+            return record
+        return None
+        
+    def get_incident_by_number(self, number: str) -> Awaitable[Optional[Dict[str, Any]]]:
+        """Get an incident by its number"""
+        return self.get_record_by_number("incident", number)
+        
+    async def get_incident_sys_id(self, number: str) -> Optional[str]:
+        """Get the sys_id of an incident by its number
+        
+        Only the sys_id field is requested, so updates that just need to
+        resolve a number don't download the whole record first. Recently
+        resolved numbers are answered from the cache without a request.
+        """
+        cached = self._sys_id_cache.get(("incident", number))
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+        
+        result = await self.request("GET", "/api/now/table/incident",
+                                  params={"sysparm_query": f"number={number}", "sysparm_limit": 1,
+                                          "sysparm_fields": "sys_id"})
+        if result.get("result"):
+            sys_id = result["result"][0]["sys_id"]
+            self._cache_sys_id("incident", number, sys_id)
+            return sys_id
         return None
         
-    async def search(self, query: str, table: str = "incident", limit: int = 10) -> Dict[str, Any]:
+    def search(self, query: str, table: str = "incident", limit: int = 10) -> Awaitable[Dict[str, Any]]:
         """Search for records using text query"""
-        return await self.request("GET", f"/api/now/table/{table}", 
-                                params={"sysparm_query": f"123TEXTQUERY321={query}", "sysparm_limit": limit})
+        return self.request("GET", f"/api/now/table/{_safe_path(table)}", 
+                          params={"sysparm_query": f"123TEXTQUERY321={query}", "sysparm_limit": limit})
                                 
     async def get_available_tables(self) -> List[str]:
         """Get a list of available tables"""
@@ -306,10 +470,9 @@ class ServiceNowClient:
                                   params={"sysparm_fields": "name,label", "sysparm_limit": 100})
         return result.get("result", [])
         
-    async def get_table_schema(self, table: str) -> Dict[str, Any]:
+    def get_table_schema(self, table: str) -> Awaitable[Dict[str, Any]]:
         """Get the schema for a table"""
-        result = await self.request("GET", f"/api/now/ui/meta/{table}")
-        return result
+        return self.request("GET", f"/api/now/ui/meta/{_safe_path(table)}")
 
 
 class ScriptUpdateModel(BaseModel):
@@ -319,6 +482,41 @@ class ScriptUpdateModel(BaseModel):
     type: str = Field(..., description="The type of script (e.g., sys_script_include)")
     description: Optional[str] = Field(None, description="Description of the script")
 
+class BulkUpdateItem(BaseModel):
+    """Model for one record in a bulk update"""
+    sys_id: str = Field(..., description="System ID of the record to update")
+    data: Dict[str, Any] = Field(..., description="Fields to set on the record")
+
+# Prompt texts are kept flush-left so no indentation is sent to the client
+_ANALYZE_PROMPT_TEMPLATE = """
+Please analyze the following ServiceNow incident {incident_number}.
+
+First, call the appropriate tool to fetch the incident details using get_incident.
+
+Then, provide a comprehensive analysis with the following sections:
+
+1. Summary: A brief overview of the incident
+2. Impact Assessment: Analysis of the impact based on the severity, priority, and affected users
+3. Root Cause Analysis: Potential causes based on available information
+4. Resolution Recommendations: Suggested next steps to resolve the incident
+5. SLA Status: Whether the incident is at risk of breaching SLAs
+
+Use a professional and clear tone appropriate for IT service management.
+"""
+
+_CREATE_PROMPT_TEXT = """
+I'll help you create a new ServiceNow incident. Please provide the following information:
+
+1. Short Description: A brief title for the incident (required)
+2. Detailed Description: A thorough explanation of the issue (required)
+3. Caller: The person reporting the issue (optional)
+4. Category and Subcategory: The type of issue (optional)
+5. Impact (1-High, 2-Medium, 3-Low): How broadly this affects users (optional)
+6. Urgency (1-High, 2-Medium, 3-Low): How time-sensitive this issue is (optional)
+
+After collecting this information, I'll use the create_incident tool to submit the incident to ServiceNow.
+"""
+
 class ServiceNowMCP:
     """ServiceNow MCP Server"""
     
@@ -330,6 +528,7 @@ class ServiceNowMCP:
         self.mcp = FastMCP(name, dependencies=[
             "requests",
             "httpx", 
+            "orjson",
             "pydantic"
         ])
         
@@ -351,6 +550,7 @@ class ServiceNowMCP:
         self.mcp.tool(name="perform_query")(self.perform_query)
         self.mcp.tool(name="add_comment")(self.add_comment)
         self.mcp.tool(name="add_work_notes")(self.add_work_notes)
+        self.mcp.tool(name="bulk_update_records")(self.bulk_update_records)
         
         # Register natural language tools
         self.mcp.tool(name="natural_language_search")(self.natural_language_search)
@@ -367,17 +567,29 @@ class ServiceNowMCP:
         
     def run(self, transport: str = "stdio"):
         """Run the ServiceNow MCP server"""
+        asyncio.run(self._serve(transport))
+        
+    async def _serve(self, transport: str):
+        """Serve on the given transport, closing the client in the same event loop"""
+        # Python 3.12+ can start tasks eagerly, so coroutines that finish without
+        # blocking never go through the scheduler; older versions keep the default
+        if hasattr(asyncio, "eager_task_factory"):
+            asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
         try:
-            self.mcp.run(transport=transport)
+            if transport == "stdio":
+                await self.mcp.run_stdio_async()
+            elif transport == "sse":
+                await self.mcp.run_sse_async()
+            else:
+                raise ValueError(f"Unknown transport: {transport}")
         finally:
-            asyncio.run(self.close())
+            await self.close()
         
     # Resource handlers
     async def list_incidents(self) -> str:
         """List recent incidents in ServiceNow"""
-        options = QueryOptions(limit=10)
-        result = await self.client.get_records("incident", options)
-        return json.dumps(result, indent=2)
+        result = await self.client.get_records("incident", _DEFAULT_LIST_OPTIONS)
+        return _json_dumps(result)
         
     async def get_incident(self, number: str) -> str:
         """Get a specific incident by number"""
@@ -385,41 +597,38 @@ class ServiceNowMCP:
             # Always use get_incident_by_number to query by incident number, not get_record
             incident = await self.client.get_incident_by_number(number)
             if incident:
-                return json.dumps({"result": incident}, indent=2)
+                return _json_dumps({"result": incident})
             else:
                 logger.error(f"No incident found with number: {number}")
-                return json.dumps({"error":{"message":"No Record found","detail":"Record doesn't exist or ACL restricts the record retrieval"},"status":"failure"})
+                return _NO_RECORD_FOUND
         except Exception as e:
             logger.error(f"Error getting incident {number}: {str(e)}")
-            return json.dumps({"error":{"message":str(e),"detail":"Error occurred while retrieving the record"},"status":"failure"})
+            return _json_dumps({"error":{"message":str(e),"detail":"Error occurred while retrieving the record"},"status":"failure"}, indent=False)
         
     async def list_users(self) -> str:
         """List users in ServiceNow"""
-        options = QueryOptions(limit=10)
-        result = await self.client.get_records("sys_user", options)
-        return json.dumps(result, indent=2)
+        result = await self.client.get_records("sys_user", _DEFAULT_LIST_OPTIONS)
+        return _json_dumps(result)
         
     async def list_knowledge(self) -> str:
         """List knowledge articles in ServiceNow"""
-        options = QueryOptions(limit=10)
-        result = await self.client.get_records("kb_knowledge", options)
-        return json.dumps(result, indent=2)
+        result = await self.client.get_records("kb_knowledge", _DEFAULT_LIST_OPTIONS)
+        return _json_dumps(result)
         
     async def get_tables(self) -> str:
         """Get a list of available tables"""
         result = await self.client.get_available_tables()
-        return json.dumps({"result": result}, indent=2)
+        return _json_dumps({"result": result})
         
     async def get_table_records(self, table: str) -> str:
         """Get records from a specific table"""
-        options = QueryOptions(limit=10)
-        result = await self.client.get_records(table, options)
-        return json.dumps(result, indent=2)
+        result = await self.client.get_records(table, _DEFAULT_LIST_OPTIONS)
+        return _json_dumps(result)
         
     async def get_table_schema(self, table: str) -> str:
         """Get the schema for a table"""
         result = await self.client.get_table_schema(table)
-        return json.dumps(result, indent=2)
+        return _json_dumps(result)
     
     # Tool handlers
     async def create_incident(self,
@@ -451,12 +660,12 @@ class ServiceNowMCP:
             logger.info(f"Creating incident from dictionary: {incident.get('short_description', 'No short description')}")
         elif isinstance(incident, IncidentCreate):
             # IncidentCreate model provided
-            incident_data = incident.dict(exclude_none=True)
+            incident_data = incident.model_dump(exclude_none=True, mode="json")
             logger.info(f"Creating incident from IncidentCreate: {incident.short_description}")
         else:
             error_message = f"Invalid incident type: {type(incident)}. Expected IncidentCreate, dict, or str."
             logger.error(error_message)
-            return json.dumps({"error": error_message})
+            return _json_dumps({"error": error_message}, indent=False)
 
         # Validate that required fields are present
         if "short_description" not in incident_data and isinstance(incident, dict):
@@ -483,13 +692,13 @@ class ServiceNowMCP:
             if ctx:
                 await ctx.info(f"Created incident: {result['result']['number']}")
                 
-            return json.dumps(result, indent=2)
+            return _json_dumps(result)
         except Exception as e:
             error_message = f"Error creating incident: {str(e)}"
             logger.error(error_message)
             if ctx:
                 await ctx.error(error_message)
-            return json.dumps({"error": error_message})
+            return _json_dumps({"error": error_message}, indent=False)
 
     async def create_case(self, case, ctx: Context = None) -> str:
         """Create a new case in the sn_customerservice_case table"""
@@ -506,14 +715,14 @@ class ServiceNowMCP:
                 f"Creating case from dictionary: {case.get('short_description', 'No short description')}"
             )
         elif isinstance(case, CaseCreate):
-            case_data = case.dict(exclude_none=True)
+            case_data = case.model_dump(exclude_none=True, mode="json")
             logger.info(f"Creating case from CaseCreate: {case.short_description}")
         else:
             error_message = (
                 f"Invalid case type: {type(case)}. Expected CaseCreate, dict, or str."
             )
             logger.error(error_message)
-            return json.dumps({"error": error_message})
+            return _json_dumps({"error": error_message}, indent=False)
 
         if "short_description" not in case_data and isinstance(case, dict):
             if "description" in case_data:
@@ -537,13 +746,13 @@ class ServiceNowMCP:
             result = await self.client.create_record("sn_customerservice_case", case_data)
             if ctx and result.get("result"):
                 await ctx.info(f"Created case: {result['result'].get('number', 'N/A')}")
-            return json.dumps(result, indent=2)
+            return _json_dumps(result)
         except Exception as e:
             error_message = f"Error creating case: {str(e)}"
             logger.error(error_message)
             if ctx:
                 await ctx.error(error_message)
-            return json.dumps({"error": error_message})
+            return _json_dumps({"error": error_message}, indent=False)
         
     async def update_incident(self,
                      number: str,
@@ -560,28 +769,28 @@ class ServiceNowMCP:
         Returns:
             JSON response from ServiceNow
         """
-        # First, get the sys_id for the incident number
+        # First, get the sys_id for the incident number. The lookup runs as a
+        # task so the progress message and payload are prepared while it's in flight
+        lookup = asyncio.create_task(self.client.get_incident_sys_id(number))
         if ctx:
             await ctx.info(f"Looking up incident: {number}")
             
-        incident = await self.client.get_incident_by_number(number)
+        data = updates.model_dump(exclude_none=True, mode="json")
+        sys_id = await lookup
         
-        if not incident:
+        if not sys_id:
             error_message = f"Incident {number} not found"
             if ctx:
                 await ctx.error(error_message)
-            return json.dumps({"error": error_message})
-            
-        sys_id = incident['sys_id']
+            return _json_dumps({"error": error_message}, indent=False)
         
         # Now update the incident
         if ctx:
             await ctx.info(f"Updating incident: {number}")
             
-        data = updates.dict(exclude_none=True)
         result = await self.client.update_record("incident", sys_id, data)
         
-        return json.dumps(result, indent=2)
+        return _json_dumps(result)
         
     async def search_records(self, 
                     query: str, 
@@ -604,7 +813,7 @@ class ServiceNowMCP:
             await ctx.info(f"Searching {table} for: {query}")
             
         result = await self.client.search(query, table, limit)
-        return json.dumps(result, indent=2)
+        return _json_dumps(result)
         
     async def get_record(self,
                 table: str,
@@ -625,7 +834,7 @@ class ServiceNowMCP:
             await ctx.info(f"Getting {table} record: {sys_id}")
             
         result = await self.client.get_record(table, sys_id)
-        return json.dumps(result, indent=2)
+        return _json_dumps(result)
         
     async def perform_query(self,
                    table: str,
@@ -659,7 +868,7 @@ class ServiceNowMCP:
         )
         
         result = await self.client.get_records(table, options)
-        return json.dumps(result, indent=2)
+        return _json_dumps(result)
         
     async def add_comment(self,
                  number: str,
@@ -679,21 +888,19 @@ class ServiceNowMCP:
         if ctx:
             await ctx.info(f"Adding comment to incident: {number}")
             
-        incident = await self.client.get_incident_by_number(number)
+        sys_id = await self.client.get_incident_sys_id(number)
         
-        if not incident:
+        if not sys_id:
             error_message = f"Incident {number} not found"
             if ctx:
                 await ctx.error(error_message)
-            return json.dumps({"error": error_message})
-            
-        sys_id = incident['sys_id']
+            return _json_dumps({"error": error_message}, indent=False)
         
         # Add the comment
         update = {"comments": comment}
         result = await self.client.update_record("incident", sys_id, update)
         
-        return json.dumps(result, indent=2)
+        return _json_dumps(result)
         
     async def add_work_notes(self,
                     number: str,
@@ -713,21 +920,51 @@ class ServiceNowMCP:
         if ctx:
             await ctx.info(f"Adding work notes to incident: {number}")
             
-        incident = await self.client.get_incident_by_number(number)
+        sys_id = await self.client.get_incident_sys_id(number)
         
-        if not incident:
+        if not sys_id:
             error_message = f"Incident {number} not found"
             if ctx:
                 await ctx.error(error_message)
-            return json.dumps({"error": error_message})
-            
-        sys_id = incident['sys_id']
+            return _json_dumps({"error": error_message}, indent=False)
         
         # Add the work notes
         update = {"work_notes": work_notes}
         result = await self.client.update_record("incident", sys_id, update)
         
-        return json.dumps(result, indent=2)
+        return _json_dumps(result)
+    
+    async def bulk_update_records(self,
+                         table: str,
+                         updates: List[BulkUpdateItem],
+                         ctx: Context = None) -> str:
+        """
+        Update several records in one call
+        
+        Args:
+            table: Table the records belong to
+            updates: The records to update, each with its sys_id and the fields to set
+            ctx: Optional context object for progress reporting
+            
+        Returns:
+            JSON response with one entry per update, in order: the ServiceNow
+            response, or an error for records that could not be updated
+        """
+        if ctx:
+            await ctx.info(f"Updating {len(updates)} {table} records")
+            
+        responses = await self.client.bulk_update(table, [(item.sys_id, item.data) for item in updates])
+        
+        results = []
+        for item, response in zip(updates, responses):
+            if isinstance(response, Exception):
+                error_message = f"Error updating {item.sys_id}: {str(response)}"
+                logger.error(error_message)
+                results.append({"error": error_message})
+            else:
+                results.append(response)
+                
+        return _json_dumps({"result": results})
     
     # Natural language tools
     async def natural_language_search(self,
@@ -751,20 +988,23 @@ class ServiceNowMCP:
         if ctx:
             await ctx.info(f"Processing natural language query: {query}")
             
-        # Parse the query
-        search_params = NLPProcessor.parse_search_query(query)
+        # Parse the query. The NLP module is imported on first use so servers
+        # that never get natural language calls don't load it at startup
+        from mcp_server_servicenow.nlp import parse_search_query
+        search_params = parse_search_query(query)
         
         if ctx:
             await ctx.info(f"Searching {search_params['table']} with query: {search_params['query']}")
         
-        # Perform the search
-        options = QueryOptions(
+        # Perform the search. The parser's output is already well-formed, so
+        # the options are built without re-running validation
+        options = QueryOptions.model_construct(
             limit=search_params['limit'],
             query=search_params['query']
         )
         
         result = await self.client.get_records(search_params['table'], options)
-        return json.dumps(result, indent=2)
+        return _json_dumps(result)
     
     async def natural_language_update(self,
                               command: str,
@@ -789,38 +1029,43 @@ class ServiceNowMCP:
             
         try:
             # Parse the command
-            record_number, updates = NLPProcessor.parse_update_command(command)
+            from mcp_server_servicenow.nlp import parse_update_command
+            record_number, updates = parse_update_command(command)
+            
+            # Start resolving the record while progress is reported
+            lookup = None
+            if record_number.startswith("INC"):
+                lookup = asyncio.create_task(self.client.get_incident_sys_id(record_number))
             
             if ctx:
                 await ctx.info(f"Updating {record_number} with: {updates}")
             
             # Get the record
-            if record_number.startswith("INC"):
-                incident = await self.client.get_incident_by_number(record_number)
-                if not incident:
+            if lookup is not None:
+                sys_id = await lookup
+                if not sys_id:
                     error_message = f"Incident {record_number} not found"
                     if ctx:
                         await ctx.error(error_message)
-                    return json.dumps({"error": error_message})
+                    return _json_dumps({"error": error_message}, indent=False)
                 
-                sys_id = incident['sys_id']
                 table = "incident"
             else:
                 # Handle other record types if needed
                 error_message = f"Record type not supported: {record_number}"
                 if ctx:
                     await ctx.error(error_message)
-                return json.dumps({"error": error_message})
+                return _json_dumps({"error": error_message}, indent=False)
             
             # Update the record
             result = await self.client.update_record(table, sys_id, updates)
-            return json.dumps(result, indent=2)
+            return _json_dumps(result)
             
         except ValueError as e:
             error_message = str(e)
             if ctx:
                 await ctx.error(error_message)
-            return json.dumps({"error": error_message})
+            return _json_dumps({"error": error_message}, indent=False)
     
     async def update_script(self,
                    script_update: ScriptUpdateModel,
@@ -842,7 +1087,7 @@ class ServiceNowMCP:
         table = script_update.type
         query = f"name={script_update.name}"
         
-        options = QueryOptions(
+        options = QueryOptions.model_construct(
             limit=1,
             query=query
         )
@@ -880,7 +1125,7 @@ class ServiceNowMCP:
                 
             result = await self.client.update_record(table, sys_id, data)
             
-        return json.dumps(result, indent=2)
+        return _json_dumps(result)
     
     # Prompt templates
     def incident_analysis_prompt(self, incident_number: str) -> str:
@@ -892,21 +1137,7 @@ class ServiceNowMCP:
         Returns:
             Prompt text for analyzing the incident
         """
-        return f"""
-        Please analyze the following ServiceNow incident {incident_number}.
-        
-        First, call the appropriate tool to fetch the incident details using get_incident.
-        
-        Then, provide a comprehensive analysis with the following sections:
-        
-        1. Summary: A brief overview of the incident
-        2. Impact Assessment: Analysis of the impact based on the severity, priority, and affected users
-        3. Root Cause Analysis: Potential causes based on available information
-        4. Resolution Recommendations: Suggested next steps to resolve the incident
-        5. SLA Status: Whether the incident is at risk of breaching SLAs
-        
-        Use a professional and clear tone appropriate for IT service management.
-        """
+        return _ANALYZE_PROMPT_TEMPLATE.format(incident_number=incident_number)
         
     def create_incident_prompt(self) -> str:
         """Create a prompt for incident creation guidance
@@ -914,25 +1145,19 @@ class ServiceNowMCP:
         Returns:
             Prompt text for helping users create an incident
         """
-        return """
-        I'll help you create a new ServiceNow incident. Please provide the following information:
-        
-        1. Short Description: A brief title for the incident (required)
-        2. Detailed Description: A thorough explanation of the issue (required)
-        3. Caller: The person reporting the issue (optional)
-        4. Category and Subcategory: The type of issue (optional)
-        5. Impact (1-High, 2-Medium, 3-Low): How broadly this affects users (optional)
-        6. Urgency (1-High, 2-Medium, 3-Low): How time-sensitive this issue is (optional)
-        
-        After collecting this information, I'll use the create_incident tool to submit the incident to ServiceNow.
-        """
+        return _CREATE_PROMPT_TEXT
 
 
-# Factory functions for creating authentication objects
+# Factory functions for creating authentication objects. BasicAuth and
+# TokenAuth never change after construction, so identical credentials share
+# one cached instance. OAuthAuth holds a live token, HTTP client and lock, so
+# each call still gets its own
+@functools.lru_cache(maxsize=64)
 def create_basic_auth(username: str, password: str) -> BasicAuth:
     """Create BasicAuth object for ServiceNow authentication"""
     return BasicAuth(username, password)
 
+@functools.lru_cache(maxsize=64)
 def create_token_auth(token: str) -> TokenAuth:
     """Create TokenAuth object for ServiceNow authentication"""
     return TokenAuth(token)
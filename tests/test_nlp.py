@@ -9,73 +9,87 @@ from mcp_server_servicenow.nlp import NLPProcessor
 class TestNLPProcessor:
     """Test cases for the NLPProcessor class"""
 
-    def test_parse_search_query(self):
+    @pytest.mark.parametrize("text, expected_table, expected_query_sub", [
+        # Basic search
+        ("find all incidents about email", "incident", "123TEXTQUERY321=email"),
+        # Different table
+        ("search for users related to admin", "sys_user", "123TEXTQUERY321=admin"),
+        # Priority
+        ("show me all incidents with high priority", "incident", "priority=1"),
+        # State
+        ("find all incidents in progress", "incident", "state=2"),
+    ])
+    def test_parse_search_query(self, text, expected_table, expected_query_sub):
         """Test parsing natural language search queries"""
-        # Test basic search
-        result = NLPProcessor.parse_search_query("find all incidents about email")
-        assert result["table"] == "incident"
-        assert "123TEXTQUERY321=email" in result["query"]
+        result = NLPProcessor.parse_search_query(text)
+        assert result["table"] == expected_table
+        assert expected_query_sub in result["query"]
 
-        # Test with different table
-        result = NLPProcessor.parse_search_query("search for users related to admin")
-        assert result["table"] == "sys_user"
-        assert "123TEXTQUERY321=admin" in result["query"]
+    def test_parse_search_query_without_keywords(self):
+        """Test parsing a query without any recognised keywords"""
+        result = NLPProcessor.parse_search_query("hello world")
+        assert result == {"table": "incident", "query": "", "limit": 10}
 
-        # Test with priority
-        result = NLPProcessor.parse_search_query("show me all incidents with high priority")
-        assert result["table"] == "incident"
-        assert "priority=1" in result["query"]
+    def test_parse_search_query_batch(self):
+        """Test parsing several search queries at once"""
+        queries = [
+            "find all incidents about email",
+            "search for users related to admin",
+            "find all incidents about email",
+            "hello world",
+        ]
+        results = NLPProcessor.parse_search_query_batch(queries)
+        assert results == [NLPProcessor.parse_search_query(query) for query in queries]
 
-        # Test with state
-        result = NLPProcessor.parse_search_query("find all incidents in progress")
-        assert result["table"] == "incident"
-        assert "state=2" in result["query"]
+        # Repeated queries must still get their own dicts
+        results[0]["limit"] = 50
+        assert results[2]["limit"] == 10
 
-    def test_parse_update_command(self):
+    @pytest.mark.parametrize("command, expected_number, expected_updates", [
+        # Basic update
+        (
+            "Update incident INC0010001 saying I'm working on it",
+            "INC0010001",
+            {"comments": "I'm working on it", "state": 2},  # In Progress
+        ),
+        # Explicit state change
+        (
+            "Close incident INC0010002 with resolution: fixed the issue",
+            "INC0010002",
+            {"state": 7, "close_notes": "fixed the issue", "close_code": "Solved (Permanently)"},  # Closed
+        ),
+        # Work notes
+        (
+            "Update incident INC0010003 with work note: internal troubleshooting steps",
+            "INC0010003",
+            {"work_notes": "internal troubleshooting steps"},
+        ),
+    ])
+    def test_parse_update_command(self, command, expected_number, expected_updates):
         """Test parsing natural language update commands"""
-        # Test basic update
-        record_number, updates = NLPProcessor.parse_update_command(
-            "Update incident INC0010001 saying I'm working on it"
-        )
-        assert record_number == "INC0010001"
-        assert updates.get("comments") == "I'm working on it"
-        assert updates.get("state") == 2  # In Progress
+        record_number, updates = NLPProcessor.parse_update_command(command)
+        assert record_number == expected_number
+        for field, value in expected_updates.items():
+            assert updates.get(field) == value
 
-        # Test with explicit state change
-        record_number, updates = NLPProcessor.parse_update_command(
-            "Close incident INC0010002 with resolution: fixed the issue"
-        )
-        assert record_number == "INC0010002"
-        assert updates.get("state") == 7  # Closed
-        assert updates.get("close_notes") == "fixed the issue"
-        assert updates.get("close_code") == "Solved (Permanently)"
+    def test_parse_update_command_returns_fresh_dict(self):
+        """Test that repeated commands don't share a cached updates dict"""
+        command = "Update incident INC0010003 with work note: internal troubleshooting steps"
+        _, updates = NLPProcessor.parse_update_command(command)
+        updates["state"] = 7
+        _, updates = NLPProcessor.parse_update_command(command)
+        assert "state" not in updates
 
-        # Test with work notes
-        record_number, updates = NLPProcessor.parse_update_command(
-            "Update incident INC0010003 with work note: internal troubleshooting steps"
-        )
-        assert record_number == "INC0010003"
-        assert updates.get("work_notes") == "internal troubleshooting steps"
-
-    def test_parse_script_update(self):
+    @pytest.mark.parametrize("command, expected_filename, expected_type", [
+        # Script include
+        ("update @my_script.js, it's a script include", "my_script.js", "sys_script_include"),
+        # Business rule
+        ("update @validation.js, it's a business rule", "validation.js", "sys_script"),
+        # Client script
+        ("update @form_script.js, it's a client script", "form_script.js", "sys_script_client"),
+    ])
+    def test_parse_script_update(self, command, expected_filename, expected_type):
         """Test parsing script update commands"""
-        # Test script include
-        filename, script_type, _ = NLPProcessor.parse_script_update(
-            "update @my_script.js, it's a script include"
-        )
-        assert filename == "my_script.js"
-        assert script_type == "sys_script_include"
-
-        # Test business rule
-        filename, script_type, _ = NLPProcessor.parse_script_update(
-            "update @validation.js, it's a business rule"
-        )
-        assert filename == "validation.js"
-        assert script_type == "sys_script"
-
-        # Test client script
-        filename, script_type, _ = NLPProcessor.parse_script_update(
-            "update @form_script.js, it's a client script"
-        )
-        assert filename == "form_script.js"
-        assert script_type == "sys_script_client"
+        filename, script_type, _ = NLPProcessor.parse_script_update(command)
+        assert filename == expected_filename
+        assert script_type == expected_type